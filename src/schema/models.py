@@ -6,7 +6,7 @@ from datetime import datetime
 from enum import Enum
 from sqlalchemy import Column, Integer, String, Float, DateTime, Text, ForeignKey, Enum as SQLEnum
 from sqlalchemy.orm import declarative_base, relationship
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 Base = declarative_base()
 
@@ -68,6 +68,9 @@ class MetricItem(BaseModel):
     单条指标的提取定义
     用于LLM结构化输出，包含指标的数值、单位、上下文和页码信息
     """
+    # extra='ignore' 跳过多余键的记录开销；frozen=True 使实例可哈希且省去赋值校验
+    model_config = ConfigDict(extra='ignore', frozen=True)
+
     value: float = Field(..., description="指标的具体数值")  # 指标的浮点数值
     unit: str = Field(default="元", description="数值单位，如：元、万元、亿元、%")  # 数值的计量单位，默认为"元"
     context: str = Field(..., description="数据所在的原文句子或表格行内容，用于溯源")  # 原始数据的上下文，用于验证和溯源
@@ -78,6 +81,8 @@ class FinancialExtractionSchema(BaseModel):
     LLM 结构化提取 Schema
     定义了LLM从财务报告中提取结构化数据的标准格式
     """
+    model_config = ConfigDict(extra='ignore', frozen=True)
+
     company_name: str = Field(..., description="公司名称")  # 财报所属公司的全名
     report_year: int = Field(..., description="财报所属年份")  # 财报报告的年份
     report_period: ReportPeriod = Field(
@@ -1,21 +1,39 @@
 """
 日志管理
 """
+import atexit
 import logging
 import os
+import queue
 from pathlib import Path
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener
+
+try:
+    # 多进程各自持有轮转句柄时，ConcurrentRotatingFileHandler 以独立锁文件
+    # 保证逐条写入原子性，避免轮转瞬间的文件锁争抢拖住并行 worker
+    from concurrent_log_handler import ConcurrentRotatingFileHandler as RotatingFileHandler
+except ImportError:
+    from logging.handlers import RotatingFileHandler
 
 class LoggerManager:
     def __init__(self, log_dir: str = "logs"):
         self.log_dir = Path(log_dir)
         self.log_dir.mkdir(exist_ok=True)
-        
+
         # 基础格式：时间 - 模块名 - 级别 - 消息
         self.formatter = logging.Formatter(
             '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
         )
 
+        # 各 logger 对应的后台 QueueListener，退出时统一停掉以刷出余量
+        self._listeners = []
+        atexit.register(self._stop_listeners)
+
+    def _stop_listeners(self):
+        for listener in self._listeners:
+            listener.stop()
+        self._listeners.clear()
+
     def get_logger(
         self, 
         name: str, 
@@ -31,48 +49,61 @@ class LoggerManager:
         :param backup_count: 保留的历史日志文件数量
         """
         logger = logging.getLogger(name)
-        
-        if not logger.handlers:
+
+        # hasHandlers 会沿父级链查找，共享祖先时也不会重复挂载
+        if not logger.hasHandlers():
             logger.setLevel(logging.INFO)
-            
+
             # 1. 轮转文件处理器
             rotating_handler = RotatingFileHandler(
-                self.log_dir / log_file, 
-                maxBytes=max_bytes, 
+                self.log_dir / log_file,
+                maxBytes=max_bytes,
                 backupCount=backup_count,
                 encoding='utf-8'
             )
             rotating_handler.setFormatter(self.formatter)
-            logger.addHandler(rotating_handler)
-            
+
             # 2. 控制台处理器
             console_handler = logging.StreamHandler()
             console_handler.setFormatter(self.formatter)
-            logger.addHandler(console_handler)
-            
+
+            # 磁盘/控制台 I/O 交给后台监听线程，emit 只做无阻塞入队，
+            # 避免日志写盘阻塞 PDF 解析等热路径
+            log_queue = queue.Queue(-1)
+            listener = QueueListener(log_queue, rotating_handler, console_handler)
+            listener.start()
+            self._listeners.append(listener)
+
+            logger.addHandler(QueueHandler(log_queue))
+
         return logger
 
 # 实例化全局管理对象
 manager = LoggerManager()
 
-# --- 预定义各个模块的 Logger ---
-
-# PDF 解析日志
-pdf_logger = manager.get_logger(
-    "PDFParser", "pdf_parser.log", max_bytes=20*1024*1024
-)
-
-# Agent 节点日志：记录状态流转，10MB 轮转
-node_logger = manager.get_logger(
-    "AgentNode", "agent_node.log"
-)
+# --- 各模块 Logger，首次访问时才构造 (PEP 562) ---
+# 属性名 -> (Logger 名称, 文件名, get_logger 额外参数)
+_LOGGER_SPECS = {
+    # PDF 解析日志
+    "pdf_logger": ("PDFParser", "pdf_parser.log", {"max_bytes": 20 * 1024 * 1024}),
+    # Agent 节点日志：记录状态流转，10MB 轮转
+    "node_logger": ("AgentNode", "agent_node.log", {}),
+    # 数据库逻辑日志
+    "db_logger": ("Database", "db_operations.log", {}),
+    # 系统全局日志
+    "sys_logger": ("System", "system.log", {}),
+}
 
-# 数据库逻辑日志
-db_logger = manager.get_logger(
-    "Database", "db_operations.log"
-)
 
-# 系统全局日志
-sys_logger = manager.get_logger(
-    "System", "system.log"
-)
\ No newline at end of file
+def __getattr__(name: str) -> logging.Logger:
+    """
+    延迟构造模块级 logger：import 本模块不再打开任何日志文件描述符，
+    并行 worker 进程的启动因此不用付出四个轮转文件句柄的开销。
+    """
+    spec = _LOGGER_SPECS.get(name)
+    if spec is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    logger_name, log_file, kwargs = spec
+    logger = manager.get_logger(logger_name, log_file, **kwargs)
+    globals()[name] = logger  # 缓存实例，后续访问不再经过 __getattr__
+    return logger
\ No newline at end of file